@@ -1,50 +1,114 @@
+import sys
+import struct
 import numpy as np
 from pathlib import Path
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
 
-def view_binary_file(filepath, num_samples=20):
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _scan(a, num_diffs):
+        """
+        Single pass over the timestamps computing min/max of the array and
+        min/max/sum of the first num_diffs consecutive differences.
+        """
+        mn = a[0]
+        mx = a[0]
+        dmin = a[0] - a[0]
+        dmax = dmin
+        dsum = 0.0
+        ndiff = min(num_diffs + 1, a.size) - 1
+        for i in range(1, a.size):
+            v = a[i]
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+            if i <= ndiff:
+                d = v - a[i - 1]
+                if i == 1 or d < dmin:
+                    dmin = d
+                if i == 1 or d > dmax:
+                    dmax = d
+                dsum += d
+        return mn, mx, dmin, dmax, dsum, ndiff
+else:
+    def _scan(a, num_diffs):
+        """NumPy fallback for the Numba kernel: same results, a few passes instead of one"""
+        d = np.diff(a[:num_diffs + 1])
+        if d.size == 0:
+            return a.min(), a.max(), 0, 0, 0.0, 0
+        return a.min(), a.max(), d.min(), d.max(), float(d.sum(dtype=np.float64)), d.size
+
+def _read_timestamps(filepath, start, count):
+    """Read count uint64 timestamps from index start as plain Python ints (display path, no numpy)"""
+    with open(filepath, 'rb') as f:
+        f.seek(start * 8)
+        raw = f.read(count * 8)
+    return [v for (v,) in struct.iter_unpack('<Q', raw[:len(raw) - len(raw) % 8])]
+
+def view_binary_file(filepath, num_samples=20, fast_summary=False):
     """
     Read and display contents of a binary file containing uint64 timestamps.
     
     Args:
         filepath: Path to the binary file
         num_samples: Number of timestamps to display from start and end
+        fast_summary: Only read the head of the file for statistics, skipping the
+            file-wide min/max scan. Useful for quick looks at very large files.
     """
     try:
-        # Read the binary file
-        data = np.fromfile(filepath, dtype=np.uint64)
-        
         # Get file size
         file_size = Path(filepath).stat().st_size
+        itemsize = np.dtype(np.uint64).itemsize
+        num_timestamps = file_size // itemsize
+        
+        if fast_summary:
+            # Only the head needed for the diff stats: ~KBs read regardless of file size
+            data = np.fromfile(filepath, dtype=np.uint64, count=1000)
+        elif num_timestamps > 0:
+            # Memory-map so only the pages we touch are read
+            data = np.memmap(filepath, dtype=np.uint64, mode='r', shape=(num_timestamps,))
+        else:
+            data = np.empty(0, dtype=np.uint64)
         
         print(f"\nFile Information:")
         print(f"Path: {filepath}")
         print(f"File size: {file_size:,} bytes")
-        print(f"Number of timestamps: {len(data):,}")
+        print(f"Number of timestamps: {num_timestamps:,}")
         
-        if len(data) > 0:
+        if num_timestamps > 0:
             print(f"\nData type: {data.dtype}")
-            print(f"Min timestamp: {data.min():,}")
-            print(f"Max timestamp: {data.max():,}")
+            mn, mx, dmin, dmax, dsum, ndiff = _scan(data, 999)
+            if fast_summary:
+                print("Min/Max timestamp: skipped (fast_summary)")
+            else:
+                print(f"Min timestamp: {mn:,}")
+                print(f"Max timestamp: {mx:,}")
             
             # Show first few timestamps
             print(f"\nFirst {num_samples} timestamps:")
-            for i, value in enumerate(data[:num_samples]):
-                print(f"[{i:3d}] {value:,}")
+            head = _read_timestamps(filepath, 0, min(num_samples, num_timestamps))
+            sys.stdout.write("\n".join(f"[{i:3d}] {v:,}" for i, v in enumerate(head)) + "\n")
                 
-            if len(data) > num_samples * 2:
+            if num_timestamps > num_samples * 2:
                 print("\n...")
                 
             # Show last few timestamps
             print(f"\nLast {num_samples} timestamps:")
-            for i, value in enumerate(data[-num_samples:]):
-                print(f"[{len(data)-num_samples+i:3d}] {value:,}")
+            start = num_timestamps - min(num_samples, num_timestamps)
+            tail = _read_timestamps(filepath, start, num_timestamps - start)
+            sys.stdout.write("\n".join(f"[{start+i:3d}] {v:,}" for i, v in enumerate(tail)) + "\n")
                 
-            # Calculate some time differences
-            time_diffs = np.diff(data[:1000])  # First 1000 differences
-            print(f"\nTime difference statistics (first 1000 pairs):")
-            print(f"Min difference: {time_diffs.min():,}")
-            print(f"Max difference: {time_diffs.max():,}")
-            print(f"Mean difference: {time_diffs.mean():,.2f}")
+            # Time differences over the first 1000 timestamps, from the same pass
+            if ndiff > 0:
+                print(f"\nTime difference statistics (first 1000 pairs):")
+                print(f"Min difference: {dmin:,}")
+                print(f"Max difference: {dmax:,}")
+                print(f"Mean difference: {dsum / ndiff:,.2f}")
             
     except Exception as e:
         print(f"Error reading file: {str(e)}")
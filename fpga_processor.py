@@ -1,6 +1,46 @@
 import numpy as np
+import pandas as pd
 from pathlib import Path
 import logging
+from typing import Dict, Optional, Tuple
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+if HAVE_NUMBA:
+    # compiled at import (cache-loaded after the first run), not on the first file
+    @njit('void(f4[::1], i8, f4[::1])', cache=True, fastmath=True)
+    def _rolling_mean(a, w, out):
+        """O(N) rolling mean: one add and one subtract per sample"""
+        s = 0.0
+        for i in range(w):
+            s += a[i]
+        out[0] = s / w
+        for i in range(w, a.shape[0]):
+            s += a[i] - a[i - w]
+            out[i - w + 1] = s / w
+
+    @njit('void(f4[::1], f4[::1])', cache=True, fastmath=True)
+    def _mean5(a, out):
+        """Fixed 5-tap mean: no running state, so LLVM can vectorize the taps"""
+        for i in range(a.shape[0] - 4):
+            out[i] = (a[i] + a[i + 1] + a[i + 2] + a[i + 3] + a[i + 4]) * 0.2
+
+    # window sizes with a specialized kernel; anything else uses _rolling_mean
+    _KERNELS = {5: _mean5}
+
+def _sniff_text_sep(filepath: Path, sniff_bytes: int = 512) -> Optional[str]:
+    """
+    Peek at the head of a file. Returns None if it looks binary (control bytes),
+    otherwise the delimiter to parse it with: ',' if one appears, else whitespace.
+    """
+    with open(filepath, 'rb') as f:
+        head = f.read(sniff_bytes)
+    if sum(b < 9 or 13 < b < 32 for b in head) >= 4:
+        return None
+    return ',' if b',' in head else r'\s+'
 
 class OpalKellyProcessor:
     def __init__(self, base_dir: str = './processed_fpga_data'):
@@ -10,25 +50,34 @@ class OpalKellyProcessor:
            
     def read_fpga_data(self, filepath: Path) -> np.ndarray:
         """Read FPGA or RedPitaya data from a file, handling various formats."""
-        try:
-            data = np.fromfile(filepath, dtype=np.uint16)
-            return data
-        except Exception as e:
-            logging.error(f"Error reading FPGA data from {filepath.name} as binary: {str(e)}")
+        # np.memmap never fails on a text file, it just returns garbage, so decide up front
+        sep = _sniff_text_sep(filepath)
+        if sep is None:
             try:
-                data = np.genfromtxt(filepath, delimiter=',', skip_header=0)
+                # Memory-map whole samples only; an odd trailing byte is ignored
+                count = filepath.stat().st_size // np.dtype(np.uint16).itemsize
+                if count == 0:
+                    return np.empty(0, dtype=np.uint16)
+                data = np.memmap(filepath, dtype=np.uint16, mode='r', shape=(count,))
                 return data
             except Exception as e:
-                logging.error(f"Error reading FPGA data from {filepath.name} with comma delimiter: {str(e)}")
-                try:
-                    data = np.genfromtxt(filepath, delimiter=None, skip_header=0)
-                    return data
-                except Exception as e:
-                    logging.error(f"Error reading FPGA data from {filepath.name} with whitespace delimiter: {str(e)}")
-                    return None
+                logging.error(f"Error reading FPGA data from {filepath.name} as binary: {str(e)}")
+                return None
+        try:
+            return self.read_text_data(filepath, sep=sep)
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, ValueError) as e:
+            logging.error(f"Error reading FPGA data from {filepath.name} as text (sep={sep!r}): {str(e)}")
+            return None
 
-    def process_file(self, filepath: Path):
-        """Process a single FPGA (or RedPitaya) data file"""
+    def read_text_data(self, filepath: Path, sep: str) -> np.ndarray:
+        """Read delimited text with pandas' C parser; single-column files come back 1D like genfromtxt"""
+        data = pd.read_csv(filepath, sep=sep, header=None, dtype=np.float64, engine='c').to_numpy()
+        if data.ndim == 2 and data.shape[1] == 1:
+            data = data[:, 0]
+        return data
+
+    def process_file(self, filepath: Path) -> Optional[Tuple[Path, Dict[str, np.ndarray]]]:
+        """Process a single FPGA (or RedPitaya) data file; returns (output file, saved arrays)"""
         try:
             data = self.read_fpga_data(filepath)
             if data is None or len(data) == 0:
@@ -38,9 +87,9 @@ class OpalKellyProcessor:
             if data.ndim == 1:
                 processed_data = self.moving_average(data, window_size=5)
                 output_filename = self.processed_dir / f"processed_{filepath.stem}.npz"
-                np.savez(output_filename, data=processed_data)
+                np.savez_compressed(output_filename, data=processed_data)
                 logging.info(f"Processed {filepath.name} as 1D data")
-                return output_filename
+                return output_filename, {'data': processed_data}
             elif data.ndim == 2 and data.shape[1] == 2:
                 timestamps = data[:, 0]
                 values = data[:, 1]
@@ -48,9 +97,9 @@ class OpalKellyProcessor:
                 processed_values = self.moving_average(values, window_size=5)
 
                 output_filename = self.processed_dir / f"processed_{filepath.stem}.npz"
-                np.savez(output_filename, timestamps=timestamps, values=processed_values)
+                np.savez_compressed(output_filename, timestamps=timestamps, values=processed_values)
                 logging.info(f"Processed {filepath.name} as 2D RedPitaya data (timestamps, values)")
-                return output_filename
+                return output_filename, {'timestamps': timestamps, 'values': processed_values}
             else:
                 # Unexpected shape
                 logging.warning(f"Data in {filepath.name} has unexpected shape {data.shape}. Cannot process.")
@@ -60,14 +109,27 @@ class OpalKellyProcessor:
             return None
 
     def moving_average(self, data, window_size):
-        """Compute the moving average of the data"""
-        data = data.flatten()
+        """Compute the moving average of the data as float32 (16-bit source, no precision lost)"""
+        # flatten() always copies; only reshape when the input isn't already flat and contiguous
+        if data.ndim > 1 or not data.flags.c_contiguous:
+            data = np.ascontiguousarray(data).ravel()
         if len(data) < window_size:
-            return data 
-        return np.convolve(data, np.ones(window_size)/window_size, mode='valid')
+            return data.astype(np.float32)
+        if HAVE_NUMBA:
+            data = np.ascontiguousarray(data, dtype=np.float32)
+            out = np.empty(len(data) - window_size + 1, dtype=np.float32)
+            kernel = _KERNELS.get(window_size)
+            if kernel is not None:
+                kernel(data, out)
+            else:
+                _rolling_mean(data, window_size, out)
+            return out
+        # cumsum-based rolling mean: O(N) and no per-window multiplies
+        c = np.cumsum(data, dtype=np.float64)
+        out = (c[window_size-1:] - np.concatenate(([0], c[:-window_size]))) / window_size
+        return out.astype(np.float32)
 
 def process_fpga_file(filepath: Path):
     """Process FPGA or RedPitaya .txt files using OpalKellyProcessor"""
     processor = OpalKellyProcessor()
-    output_file = processor.process_file(filepath)
-    return output_file
+    return processor.process_file(filepath)
@@ -2,12 +2,45 @@ import numpy as np
 import os
 import h5py
 import logging
+import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 SAMP_FREQ = 200e6
+CHUNK_ROWS = 1 << 20
 
-def process_gagescope_file(filepath: Path) -> Optional[Path]:
+def _savez_streamed(output_filename: Path, arrays: Dict[str, np.ndarray], datasets: Dict[str, h5py.Dataset]):
+    """
+    Write an uncompressed .npz (same layout as np.savez), copying each HDF5
+    dataset into its archive member CHUNK_ROWS rows at a time so no dataset
+    is ever fully loaded into memory. Rows are read with read_direct into a
+    staging buffer that is reused across chunks and same-shaped datasets.
+    """
+    buffers = {}
+    with zipfile.ZipFile(output_filename, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for name, arr in arrays.items():
+            with zf.open(f"{name}.npy", mode='w', force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asanyarray(arr), allow_pickle=False)
+        for name, ds in datasets.items():
+            with zf.open(f"{name}.npy", mode='w', force_zip64=True) as f:
+                if ds.ndim == 0:
+                    np.lib.format.write_array(f, np.asarray(ds[()]), allow_pickle=False)
+                    continue
+                header = {'descr': np.lib.format.dtype_to_descr(ds.dtype),
+                          'fortran_order': False,
+                          'shape': ds.shape}
+                np.lib.format.write_array_header_1_0(f, header)
+                rows = min(CHUNK_ROWS, ds.shape[0])
+                key = (ds.dtype, ds.shape[1:])
+                buf = buffers.get(key)
+                if buf is None or buf.shape[0] < rows:
+                    buf = buffers[key] = np.empty((rows,) + ds.shape[1:], dtype=ds.dtype)
+                for start in range(0, ds.shape[0], CHUNK_ROWS):
+                    n = min(CHUNK_ROWS, ds.shape[0] - start)
+                    ds.read_direct(buf, np.s_[start:start + n], np.s_[0:n])
+                    f.write(memoryview(buf[:n]).cast('B'))
+
+def process_gagescope_file(filepath: Path) -> Optional[Tuple[Path, Dict[str, np.ndarray]]]:
     """
     Process an .h5 file that could be either gagescope or JKAM/High NA Imaging data.
     Logic:
@@ -18,6 +51,8 @@ def process_gagescope_file(filepath: Path) -> Optional[Path]:
       * Load all frame-xx datasets (e.g., frame-02, frame-03, etc.)
       * Create a dummy timestamps array (just a single value or a small array).
     - If no pattern found, return None.
+    Returns (output_filename, arrays) where arrays holds the in-memory arrays that were
+    saved (the timestamps); the streamed HDF5 datasets are only in the output file.
     """
 
     try:
@@ -29,14 +64,14 @@ def process_gagescope_file(filepath: Path) -> Optional[Path]:
                     logging.warning(f"Gagescope file {filepath.name} has no CHx_frame datasets.")
                     return None
 
-                # load channel frame datasets into dict
+                # channel frame datasets are streamed to the output, not loaded
                 data_dict = {}
                 length = None
                 for ds_name in ch_datasets:
-                    arr = hf[ds_name][:]
-                    data_dict[ds_name] = arr
-                    if length is None:
-                        length = arr.shape[0]
+                    ds = hf[ds_name]
+                    data_dict[ds_name] = ds
+                    if length is None and ds.ndim > 0:
+                        length = ds.shape[0]
 
                 if length is None:
                     logging.warning(f"No valid channel frames in {filepath.name}")
@@ -49,9 +84,9 @@ def process_gagescope_file(filepath: Path) -> Optional[Path]:
                 processed_dir = Path("processed_files")
                 processed_dir.mkdir(exist_ok=True)
                 output_filename = processed_dir / f"processed_{filepath.stem}.npz"
-                np.savez(output_filename, timestamps=timestamps, **data_dict)
+                _savez_streamed(output_filename, {'timestamps': timestamps}, data_dict)
                 logging.info(f"Processed gagescope file {filepath.name} saved as {output_filename.name}")
-                return output_filename
+                return output_filename, {'timestamps': timestamps}
 
             elif 'jkam_capture_' in filename:
                 # just added newly - high na imaging
@@ -62,7 +97,7 @@ def process_gagescope_file(filepath: Path) -> Optional[Path]:
 
                 frames_data = {}
                 for fk in frame_keys:
-                    frames_data[fk.replace('-', '_')] = hf[fk][:]
+                    frames_data[fk.replace('-', '_')] = hf[fk]
 
                 # just creating dummy timestamp for now
                 timestamps = np.array([0.0])
@@ -70,9 +105,9 @@ def process_gagescope_file(filepath: Path) -> Optional[Path]:
                 processed_dir = Path("processed_files")
                 processed_dir.mkdir(exist_ok=True)
                 output_filename = processed_dir / f"processed_{filepath.stem}.npz"
-                np.savez(output_filename, timestamps=timestamps, **frames_data)
+                _savez_streamed(output_filename, {'timestamps': timestamps}, frames_data)
                 logging.info(f"Processed JKAM (High NA) file {filepath.name} saved as {output_filename.name}")
-                return output_filename
+                return output_filename, {'timestamps': timestamps}
 
             else:
                 logging.warning(f"{filepath.name} does not match gage_shot_ or jkam_capture_ patterns.")
@@ -1,21 +1,75 @@
 import threading
+import time
 import os
+import shutil
 from pathlib import Path
-from queue import Empty
+from queue import Queue, Empty, Full
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, filedialog
 from pipeline_builder import FileProcessor, process_queue, FileWatcher
 import logging
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, HAVE_CEXT
 
 logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(levelname)s - %(message)s')
 
+INSERT_SQL = """
+INSERT INTO experiment_results (experiment_number, file_name, accepted, summary_statistics, processor_type, cumulative_value)
+VALUES (%s, %s, %s, %s, %s, %s);
+"""
+# buffered result rows are written to MySQL once this many pile up, or after this long
+DB_FLUSH_ROWS = 50
+DB_FLUSH_INTERVAL = 0.5
+# concurrent copies when several files are added at once
+COPY_WORKERS = 4
+# threads pulling from the processing queue; files are independent and the heavy steps
+# (NumPy, SciPy, nogil Numba kernels, file I/O) run without the GIL
+PROCESS_WORKERS = max(2, (os.cpu_count() or 2) - 1)
+# past this many points the tracking line drops its markers (they dominate render time)
+TRACKING_MARKER_LIMIT = 2000
+# plots redraw at most this often (seconds); data still arrives for every file
+PLOT_MIN_INTERVAL = 0.1
+# characters of the summary shown in the table; the full text shows when a row is selected
+SUMMARY_PREVIEW_CHARS = 80
+# most results handed to the Tk thread at once, so it can repaint between batches
+DISPLAY_BATCH_MAX = 200
+# pause (seconds) before retrying a batch the Tk thread couldn't be handed
+DISPLAY_RETRY_DELAY = 0.1
+# rows rendered past the bottom edge of the table, so a partially visible row is filled
+TABLE_OVERSCAN = 2
+
+def _lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: keeps n_out points (always the first and
+    last) chosen to preserve the visual shape of the line.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    xf = np.asarray(x, dtype=np.float64)
+    yf = np.asarray(y, dtype=np.float64)
+    # n_out - 2 buckets spanning the points between the fixed first and last ones
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            cx = xf[hi:edges[i + 2]].mean()
+            cy = yf[hi:edges[i + 2]].mean()
+        else:
+            cx, cy = xf[-1], yf[-1]
+        # triangle area (x2) between the last kept point, each candidate and the next bucket's mean
+        area = np.abs((xf[a] - cx) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (cy - yf[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return np.asarray(x)[keep], np.asarray(y)[keep]
+
 class GUIApp:
     def __init__(self, root):
         self.root = root
@@ -24,13 +78,25 @@ class GUIApp:
         self.setup_processor()
         self.create_widgets()
         self.start_background_threads()
-        self.update_display()
 
-        self.cumulative_values = []
-        self.experiment_numbers = []
+        # tracking series as growable numpy buffers; [:self._n] views go straight to set_data
+        self._cap = 1 << 14
+        self._exp = np.zeros(self._cap, dtype=np.int64)
+        self._cum = np.zeros(self._cap, dtype=np.int64)
+        self._n = 0
         self.current_fft_data = None
 
+        # plots are built on the first mainloop tick; refreshes before then just stay pending
+        self.canvas = None
+        self._tracking_dirty = False
+        self._fft_show = None
+        self._plot_job = None
+        self._last_draw = 0.0
+
         self.setup_database()
+        # importing matplotlib and building the figure takes a few hundred ms, so it
+        # happens after the watcher is already live instead of delaying startup
+        self.root.after(0, self.create_graphs)
 
     def setup_processor(self):
         self.processor.register_processor(".bin", "photon")
@@ -47,21 +113,30 @@ class GUIApp:
         self.processor.observer.start()
 
     def setup_database(self):
+        # the writer thread opens, owns and closes the MySQL connection
+        self._db_queue = Queue()
+        self._db_thread = threading.Thread(target=self._db_worker, daemon=True)
+        self._db_thread.start()
+
+    def connect_database(self):
         try:
-            self.connection = mysql.connector.connect(
+            # C protocol implementation when it's installed (much cheaper parameter binding)
+            connection = mysql.connector.connect(
+                use_pure=not HAVE_CEXT,
+                autocommit=False,
                 host='localhost',
                 database='file_processor_db',
                 user='user1',
                 password='sisyphus'
             )
-            if self.connection.is_connected():
-                logging.info("Connected to MySQL database")
-                self.create_table()
+            logging.info("Connected to MySQL database")
+            self.create_table(connection)
+            return connection
         except Error as e:
             logging.error(f"Error connecting to MySQL database: {e}")
-            self.connection = None
+            return None
 
-    def create_table(self):
+    def create_table(self, connection):
         create_table_query = """
         CREATE TABLE IF NOT EXISTS experiment_results (
             id INT AUTO_INCREMENT PRIMARY KEY,
@@ -74,35 +149,52 @@ class GUIApp:
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         );
         """
-        cursor = self.connection.cursor()
+        cursor = connection.cursor()
         cursor.execute(create_table_query)
-        self.connection.commit()
+        connection.commit()
         cursor.close()
 
-    def insert_record(self, experiment_number, file_name, accepted, summary_statistics, processor_type, cumulative_value):
-        if self.connection is None or not self.connection.is_connected():
-            logging.error("Not connected to the database. Record not inserted.")
+    def _db_worker(self):
+        # sole user of the MySQL connection: batches queued rows and writes them every
+        # DB_FLUSH_ROWS rows or DB_FLUSH_INTERVAL seconds, whichever first, so the Tk thread never
+        # waits on the database; a None sentinel flushes what's left, closes it and stops
+        connection = self.connect_database()
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                rows = self._db_queue.get(timeout=timeout)
+            except Empty:
+                rows = []
+            if rows is None:
+                break
+            if rows and not pending:
+                deadline = time.monotonic() + DB_FLUSH_INTERVAL
+            pending.extend(rows)
+            if pending and (len(pending) >= DB_FLUSH_ROWS or time.monotonic() >= deadline):
+                self.insert_records(connection, pending)
+                pending = []
+                deadline = None
+        if pending:
+            self.insert_records(connection, pending)
+        if connection is not None:
+            connection.close()
+            logging.info("Database connection closed.")
+
+    def insert_records(self, connection, rows):
+        if connection is None:
+            logging.error(f"Not connected to the database. {len(rows)} record(s) not inserted.")
             return
-        insert_query = """
-        INSERT INTO experiment_results (experiment_number, file_name, accepted, summary_statistics, processor_type, cumulative_value)
-        VALUES (%s, %s, %s, %s, %s, %s);
-        """
         try:
-            cursor = self.connection.cursor()
-            data_tuple = (
-                int(experiment_number),
-                file_name,
-                bool(accepted),
-                summary_statistics,
-                processor_type,
-                int(cumulative_value)
-            )
-            cursor.execute(insert_query, data_tuple)
-            self.connection.commit()
+            cursor = connection.cursor()
+            # executemany on a plain cursor rewrites this into one multi-row INSERT (single round-trip)
+            cursor.executemany(INSERT_SQL, rows)
+            connection.commit()
             cursor.close()
-            logging.info(f"Inserted record for file {file_name} into the database.")
+            logging.info(f"Inserted {len(rows)} record(s) into the database.")
         except Error as e:
-            logging.error(f"Error inserting record into MySQL database: {e}")
+            logging.error(f"Error inserting records into MySQL database: {e}")
 
     def create_widgets(self):
         self.paned_window = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
@@ -115,12 +207,15 @@ class GUIApp:
         self.paned_window.add(self.right_frame, weight=2)
 
         self.create_table_widget()
-        self.create_graphs()
 
         self.add_file_button = ttk.Button(self.root, text="Add File", command=self.add_file)
         self.add_file_button.pack(side=tk.BOTTOM, pady=5)
 
     def create_table_widget(self):
+        # full summary of the selected row; the table itself only shows a preview
+        self.detail_label = ttk.Label(self.left_frame, text="", anchor='w', justify=tk.LEFT, wraplength=600)
+        self.detail_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+
         table_frame = ttk.Frame(self.left_frame)
         table_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -137,9 +232,20 @@ class GUIApp:
         self.table.column("Space Correct", width=100, anchor='center', stretch=False)
         self.table.column("Summary Statistics", width=600, anchor='w', stretch=False)
 
-        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.table.yview)
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.table.configure(yscrollcommand=v_scrollbar.set)
+        # Rows are virtualized: the full history lives in self._rows and only the visible
+        # window is inserted into the Treeview, so the vertical scrollbar drives our own
+        # window offset instead of Treeview.yview
+        self._rows = []
+        self._row_details = []
+        self._view_start = 0
+        self._follow_tail = True
+        self.v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self._on_scroll)
+        self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.table.bind('<Configure>', lambda event: self._render_rows())
+        self.table.bind('<MouseWheel>', self._on_mousewheel)
+        self.table.bind('<Button-4>', lambda event: self._scroll_rows(-3))
+        self.table.bind('<Button-5>', lambda event: self._scroll_rows(3))
+        self.table.bind('<<TreeviewSelect>>', self._on_row_select)
 
         h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.table.xview)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
@@ -147,57 +253,182 @@ class GUIApp:
 
         self.table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
+    def _visible_row_count(self):
+        row_height = 20
+        children = self.table.get_children()
+        if children:
+            bbox = self.table.bbox(children[0])
+            if bbox:
+                row_height = bbox[3]
+        # one row's worth of height goes to the headings
+        return max(1, self.table.winfo_height() // row_height - 1)
+
+    def _render_rows(self):
+        total = len(self._rows)
+        visible = self._visible_row_count()
+        last_start = max(0, total - visible)
+        if self._follow_tail:
+            self._view_start = last_start
+        self._view_start = min(max(0, self._view_start), last_start)
+
+        end = min(total, self._view_start + visible + TABLE_OVERSCAN)
+        selected = self.table.selection()
+        self.table.delete(*self.table.get_children())
+        for index in range(self._view_start, end):
+            self.table.insert('', tk.END, iid=str(index), values=self._rows[index])
+        kept = [iid for iid in selected if self.table.exists(iid)]
+        if kept:
+            self.table.selection_set(kept)
+
+        if total:
+            self.v_scrollbar.set(self._view_start / total, min(1.0, (self._view_start + visible) / total))
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+
+    def _on_row_select(self, event):
+        selection = self.table.selection()
+        if selection:
+            self.detail_label.configure(text=self._row_details[int(selection[0])])
+
+    def _scroll_rows(self, delta):
+        self._view_start += delta
+        self._follow_tail = self._view_start >= len(self._rows) - self._visible_row_count()
+        self._render_rows()
+        return "break"
+
+    def _on_scroll(self, *args):
+        if args[0] == 'moveto':
+            target = int(float(args[1]) * len(self._rows))
+            self._scroll_rows(target - self._view_start)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self._visible_row_count()
+            self._scroll_rows(step)
+
+    def _on_mousewheel(self, event):
+        return self._scroll_rows(-3 * int(event.delta / 120))
+
     def create_graphs(self):
-        self.graphs_paned_window = ttk.PanedWindow(self.right_frame, orient=tk.VERTICAL)
-        self.graphs_paned_window.pack(fill=tk.BOTH, expand=True)
+        import matplotlib.style
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-        tracking_frame = ttk.Frame(self.graphs_paned_window)
-        self.graphs_paned_window.add(tracking_frame, weight=1)
+        # 'fast' turns on path simplification (threshold 1.0) and Agg path chunking, so long
+        # lines skip sub-pixel vertices instead of stroking every point
+        matplotlib.style.use('fast')
 
-        fft_frame = ttk.Frame(self.graphs_paned_window)
-        self.graphs_paned_window.add(fft_frame, weight=1)
+        # one figure and one canvas for both plots: a single Agg render and Tk paste per redraw
+        self.figure = Figure(figsize=(5, 6), dpi=100)
+        self.tracking_ax, self.fft_ax = self.figure.subplots(2, 1)
+        self.figure.subplots_adjust(hspace=0.5)
 
-        self.tracking_figure = plt.Figure(figsize=(5, 3), dpi=100)
-        self.tracking_ax = self.tracking_figure.add_subplot(111)
         self.tracking_ax.set_title("Cumulative Accepted Files")
         self.tracking_ax.set_xlabel("Experiment Number")
         self.tracking_ax.set_ylabel("Cumulative Value")
-        self.tracking_canvas = FigureCanvasTkAgg(self.tracking_figure, master=tracking_frame)
-        self.tracking_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.tracking_ax.grid(True)
+        self.tracking_ax.set_xlim(0, 10)
+        self.tracking_ax.set_ylim(-1, 10)
+        # animated lines are left out of full draws and blitted on top of a cached background
+        self._tracking_line, = self.tracking_ax.plot([], [], marker='o', animated=True)
+        self._tracking_bg = None
 
-        self.fft_figure = plt.Figure(figsize=(5, 3), dpi=100)
-        self.fft_ax = self.fft_figure.add_subplot(111)
         self.fft_ax.set_title("FFT of the Signal")
         self.fft_ax.set_xlabel("Frequency")
         self.fft_ax.set_ylabel("Amplitude")
-        self.fft_canvas = FigureCanvasTkAgg(self.fft_figure, master=fft_frame)
-        self.fft_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.fft_ax.grid(True)
+        self._fft_line, = self.fft_ax.plot([], [], animated=True)
+        self._fft_bg = None
+        self._fft_placeholder = self.fft_ax.text(0.5, 0.5, "No FFT data available", ha='center', va='center',
+                                                 transform=self.fft_ax.transAxes)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.right_frame)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
 
-        fft_frame.pack_forget()
-        self.fft_frame = fft_frame
+        # show anything that arrived while the figure was being built
+        if self._tracking_dirty or self._fft_show is not None:
+            self.request_plot_refresh(False, None)
 
     def add_file(self):
         file_paths = filedialog.askopenfilenames()
         if file_paths:
             os.makedirs(self.watch_path, exist_ok=True)
-            for file_path in file_paths:
-                dest_path = os.path.join(self.watch_path, os.path.basename(file_path))
-                try:
-                    with open(file_path, 'rb') as src_file, open(dest_path, 'wb') as dst_file:
-                        dst_file.write(src_file.read())
-                    logging.info(f"File {file_path} added to watch directory.")
-                except Exception as e:
-                    logging.error(f"Error adding file {file_path}: {e}")
+            # copy off the Tk thread so large acquisition files don't freeze the GUI
+            threading.Thread(target=self.copy_files, args=(file_paths,), daemon=True).start()
 
-    def start_background_threads(self):
-        self.processing_thread = threading.Thread(target=process_queue, args=(self.processor,), daemon=True)
-        self.processing_thread.start()
+    def copy_files(self, file_paths):
+        # a few copies in flight at once keeps the disk queue busy for multi-file batches
+        with ThreadPoolExecutor(max_workers=min(COPY_WORKERS, len(file_paths))) as pool:
+            pool.map(self.copy_file, file_paths)
 
-    def update_display(self):
+    def copy_file(self, file_path):
+        dest_path = os.path.join(self.watch_path, os.path.basename(file_path))
         try:
-            while True:
-                processor_type, output_file, accepted, stats = self.processor.display_queue.get_nowait()
+            shutil.copyfile(file_path, dest_path)
+            logging.info(f"File {file_path} added to watch directory.")
+        except Exception as e:
+            logging.error(f"Error adding file {file_path}: {e}")
 
+    def start_background_threads(self):
+        self.processing_threads = []
+        for _ in range(PROCESS_WORKERS):
+            thread = threading.Thread(target=process_queue, args=(self.processor,), daemon=True)
+            thread.start()
+            self.processing_threads.append(thread)
+        self._display_done = threading.Event()
+        # after_idle from another thread needs a running mainloop, so the drain thread is
+        # started from its first tick; results arriving before then wait in the queue
+        self.root.after(0, self._start_drain_thread)
+
+    def _start_drain_thread(self):
+        self.display_thread = threading.Thread(target=self._drain_loop, daemon=True)
+        self.display_thread.start()
+
+    def _drain_loop(self):
+        # blocks on the display queue (no idle wakeups) and hands each burst to the Tk
+        # thread as soon as it arrives; on_closing puts a None sentinel to stop it.
+        # Bursts are capped at DISPLAY_BATCH_MAX and the next one waits until update_display
+        # has run, so a file storm backs up into the bounded queue instead of starving Tk
+        display_queue = self.processor.display_queue
+        stopping = False
+        while not stopping:
+            item = display_queue.get()
+            if item is None:
+                break
+            items = [item]
+            try:
+                while len(items) < DISPLAY_BATCH_MAX:
+                    item = display_queue.get_nowait()
+                    if item is None:
+                        stopping = True
+                        break
+                    items.append(item)
+            except Empty:
+                pass
+            self._display_done.clear()
+            while True:
+                try:
+                    self.root.after_idle(self.update_display, items)
+                    break
+                except (RuntimeError, tk.TclError) as e:
+                    if not self.processor.should_continue:
+                        # root already destroyed during shutdown
+                        return
+                    # this is the only display thread: never give up on it while running
+                    logging.error(f"Error handing results to the display, retrying: {e}")
+                    time.sleep(DISPLAY_RETRY_DELAY)
+            self._display_done.wait()
+            if not self.processor.should_continue:
+                break
+
+    def update_display(self, items):
+        rows = []
+        table_rows = []
+        tracking_dirty = False
+        fft_show = None
+        try:
+            for processor_type, output_file, accepted, stats in items:
                 accepted = bool(accepted)
                 experiment_number = int(stats.get('experiment_number', 0))
                 cumulative_value = int(stats.get('cumulative_value', 0))
@@ -208,70 +439,174 @@ class GUIApp:
                 status = "Accepted" if accepted else "Rejected"
                 file_name = stats.get('file_name', '')
 
-                self.table.insert('', tk.END, values=(
-                    experiment_number, file_name, status, matched_jkam_shot, space_correct, summary_stats
+                table_rows.append((
+                    experiment_number, file_name, status, matched_jkam_shot, space_correct,
+                    summary_stats[:SUMMARY_PREVIEW_CHARS]
                 ))
+                self._row_details.append(summary_stats)
 
-                self.insert_record(
-                    experiment_number=experiment_number,
-                    file_name=file_name,
-                    accepted=accepted,
-                    summary_statistics=summary_stats,
-                    processor_type=processor_type,
-                    cumulative_value=cumulative_value
-                )
+                rows.append((
+                    experiment_number, file_name, accepted, summary_stats, processor_type, cumulative_value
+                ))
 
-                self.cumulative_values.append(cumulative_value)
-                self.experiment_numbers.append(experiment_number)
-                self.update_tracking_plot()
+                self._append_tracking_point(experiment_number, cumulative_value)
+                tracking_dirty = True
 
+                # plots are redrawn once per burst below; the last item decides the FFT state
                 fft_data = stats.get('fft_data', None)
                 if fft_data is not None and processor_type == "gagescope":
                     self.current_fft_data = fft_data
-                    self.update_fft_plot(show=True)
+                    fft_show = True
                 else:
-                    self.update_fft_plot(show=False)
-        except Empty:
-            pass
+                    fft_show = False
         except Exception as e:
             logging.error(f"Error in update_display: {str(e)}")
         finally:
-            self.root.after(1000, self.update_display)
+            try:
+                if rows:
+                    self._db_queue.put(rows)
+                if table_rows:
+                    self._rows.extend(table_rows)
+                    self._render_rows()
+                if tracking_dirty or fft_show is not None:
+                    self.request_plot_refresh(tracking_dirty, fft_show)
+            except Exception as e:
+                logging.error(f"Error refreshing display: {str(e)}")
+            finally:
+                # the drain thread blocks on this, so it must be set even if drawing failed
+                self._display_done.set()
+
+    def request_plot_refresh(self, tracking_dirty, fft_show):
+        # data is recorded for every file, but plots redraw at most once per PLOT_MIN_INTERVAL;
+        # anything arriving sooner is folded into one trailing refresh
+        self._tracking_dirty = self._tracking_dirty or tracking_dirty
+        if fft_show is not None:
+            self._fft_show = fft_show
+        if self._plot_job is not None:
+            return
+        wait = self._last_draw + PLOT_MIN_INTERVAL - time.monotonic()
+        if wait <= 0:
+            self.refresh_plots()
+        else:
+            self._plot_job = self.root.after(int(wait * 1000) + 1, self.refresh_plots)
+
+    def refresh_plots(self):
+        self._plot_job = None
+        if self.canvas is None:
+            return
+        self._last_draw = time.monotonic()
+        if self._tracking_dirty:
+            self._tracking_dirty = False
+            self.update_tracking_plot()
+        if self._fft_show is not None:
+            fft_show, self._fft_show = self._fft_show, None
+            self.update_fft_plot(show=fft_show)
+
+    def _on_draw(self, event):
+        # any full redraw (startup, resize, new limits) re-captures both static backgrounds
+        self._tracking_bg = self.canvas.copy_from_bbox(self.tracking_ax.bbox)
+        self._fft_bg = self.canvas.copy_from_bbox(self.fft_ax.bbox)
+        self.tracking_ax.draw_artist(self._tracking_line)
+        self.fft_ax.draw_artist(self._fft_line)
+
+    def _blit(self, ax, line, background):
+        self.canvas.restore_region(background)
+        ax.draw_artist(line)
+        self.canvas.blit(ax.bbox)
+
+    def _append_tracking_point(self, experiment_number, cumulative_value):
+        if self._n == self._cap:
+            self._cap *= 2
+            self._exp = np.resize(self._exp, self._cap)
+            self._cum = np.resize(self._cum, self._cap)
+        self._exp[self._n] = experiment_number
+        self._cum[self._n] = cumulative_value
+        self._n += 1
 
     def update_tracking_plot(self):
-        self.tracking_ax.clear()
-        self.tracking_ax.plot(self.experiment_numbers, self.cumulative_values, marker='o')
-        self.tracking_ax.set_title("Cumulative Accepted Files")
-        self.tracking_ax.set_xlabel("Experiment Number")
-        self.tracking_ax.set_ylabel("Cumulative Value")
-        self.tracking_ax.grid(True)
-        self.tracking_canvas.draw()
+        # line artist is created once in create_graphs; just swap its data
+        experiment_numbers = self._exp[:self._n]
+        cumulative_values = self._cum[:self._n]
+        # no point handing matplotlib more than ~2 points per pixel column
+        max_points = int(2 * self.tracking_ax.bbox.width)
+        if self._n > max_points:
+            xs, ys = _lttb(experiment_numbers, cumulative_values, max_points)
+        else:
+            xs, ys = experiment_numbers, cumulative_values
+        self._tracking_line.set_data(xs, ys)
+        if self._n > TRACKING_MARKER_LIMIT and self._tracking_line.get_marker() != 'None':
+            self._tracking_line.set_marker('None')
+
+        # limits only grow (doubling), so most updates fit and can be blitted;
+        # a change of limits needs the ticks redrawn, which goes through a full draw
+        limits_changed = False
+        x = experiment_numbers[-1] if self._n else 0
+        y = cumulative_values[-1] if self._n else 0
+        xmin, xmax = self.tracking_ax.get_xlim()
+        ymin, ymax = self.tracking_ax.get_ylim()
+        if x > xmax:
+            self.tracking_ax.set_xlim(xmin, 2 * x)
+            limits_changed = True
+        if y > ymax:
+            self.tracking_ax.set_ylim(ymin, 2 * y)
+            limits_changed = True
+
+        if limits_changed or self._tracking_bg is None:
+            self.canvas.draw_idle()
+        else:
+            self._blit(self.tracking_ax, self._tracking_line, self._tracking_bg)
 
     def update_fft_plot(self, show=True):
-        self.fft_ax.clear()
+        has_data = False
         if show and self.current_fft_data is not None:
             freq = self.current_fft_data.get('freq')
             amplitude = self.current_fft_data.get('amplitude')
             if freq is not None and amplitude is not None and len(freq) > 0 and len(amplitude) > 0:
-                self.fft_ax.plot(freq, amplitude)
-                self.fft_ax.set_title("FFT of the Signal")
-                self.fft_ax.set_xlabel("Frequency")
-                self.fft_ax.set_ylabel("Amplitude")
-                self.fft_ax.grid(True)
-            else:
-                self.fft_ax.text(0.5, 0.5, "No FFT data available", ha='center', va='center')
-        else:
+                has_data = True
+
+        if not has_data and not self._fft_placeholder.get_visible():
             # Just show a placeholder message if no FFT data
-            self.fft_ax.text(0.5, 0.5, "No FFT data available", ha='center', va='center')
+            self._fft_line.set_data([], [])
+            self._fft_placeholder.set_visible(True)
+            self.canvas.draw_idle()
+            return
+        if not has_data:
+            return  # placeholder already showing, nothing to redraw
+
+        # Agg renders in float32 anyway; converting once halves the bytes walked on every redraw
+        freq = np.asarray(freq, dtype=np.float32)
+        amplitude = np.asarray(amplitude, dtype=np.float32)
+        self._fft_line.set_data(freq, amplitude)
+        full_redraw = self._fft_placeholder.get_visible() or self._fft_bg is None
+        self._fft_placeholder.set_visible(False)
+
+        # reuse the current limits (and cached background) while the spectrum fits them reasonably
+        top = max(float(np.max(amplitude)), 1e-12)
+        xlim = (float(freq[0]), float(freq[-1]))
+        ymin, ymax = self.fft_ax.get_ylim()
+        if self.fft_ax.get_xlim() != xlim or top > ymax or top < 0.5 * ymax:
+            self.fft_ax.set_xlim(*xlim)
+            self.fft_ax.set_ylim(0, 1.1 * top)
+            full_redraw = True
+
         # Was doing wrong - basically don't pack_forget() the frame, just keep it as is
-        self.fft_canvas.draw()
+        if full_redraw:
+            self.canvas.draw_idle()
+        else:
+            self._blit(self.fft_ax, self._fft_line, self._fft_bg)
 
     def on_closing(self):
         logging.info("Shutting down...")
-        if self.connection is not None and self.connection.is_connected():
-            self.connection.close()
-            logging.info("Database connection closed.")
+        self._db_queue.put(None)
+        self._db_thread.join()
         self.processor.should_continue = False
+        # release the drain thread whether it's waiting on a batch that will never be
+        # displayed or blocked on an empty queue (a full queue means it isn't)
+        self._display_done.set()
+        try:
+            self.processor.display_queue.put_nowait(None)
+        except Full:
+            pass
         self.processor.observer.stop()
         self.processor.observer.join()
         self.root.destroy()
@@ -4,6 +4,6 @@ from pathlib import Path
 from picolog_preprocessor import PicologPreprocessor
 
 def process_photon_file(filepath: Path):
+    """Returns (output_file, in-memory arrays) from PicologPreprocessor, or None"""
     preprocessor = PicologPreprocessor(processed_directory='./processed_photon_data')
-    output_file = preprocessor.process_file(filepath)
-    return output_file
+    return preprocessor.process_file(filepath)
@@ -3,6 +3,47 @@ from pathlib import Path
 from scipy import signal
 import logging
 import uuid
+from functools import lru_cache
+try:
+    from numba import njit, types
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+if HAVE_NUMBA:
+    # compiled at import like the other kernels; read_binary_file hands back a read-only
+    # array (memmap or frombuffer), which Numba types separately from a writable one
+    _F8 = types.float64[::1]
+    @njit(['Tuple((f8[::1], f8[::1], f8[::1]))(u8[::1])',
+           types.Tuple((_F8, _F8, _F8))(types.Array(types.uint64, 1, 'C', readonly=True))],
+          cache=True, nogil=True)
+    def _scale_diff_positive(ts_ps):
+        """
+        One pass over the raw picosecond timestamps: scale to seconds and keep each
+        positive consecutive difference with the timestamp that ends it. Same result
+        as the NumPy path without its N-sized temporaries.
+        """
+        n = ts_ps.shape[0]
+        ts_s = np.empty(n, dtype=np.float64)
+        diffs = np.empty(max(n - 1, 0), dtype=np.float64)
+        ts_filtered = np.empty(max(n - 1, 0), dtype=np.float64)
+        k = 0
+        if n > 0:
+            ts_s[0] = ts_ps[0] * 1e-12
+        for i in range(1, n):
+            t = ts_ps[i] * 1e-12
+            ts_s[i] = t
+            d = t - ts_s[i - 1]
+            if d > 0:
+                diffs[k] = d
+                ts_filtered[k] = t
+                k += 1
+        return ts_s, diffs[:k], ts_filtered[:k]
+
+@lru_cache(maxsize=64)
+def _butter_lowpass_sos(normal_cutoff, order):
+    """Butterworth low-pass design as second-order sections, cached across files"""
+    return signal.butter(order, normal_cutoff, btype='low', analog=False, output='sos')
 
 class PicologPreprocessor:
     def __init__(self, processed_directory):
@@ -15,11 +56,18 @@ class PicologPreprocessor:
         normal_cutoff = cutoff / nyq
         if normal_cutoff >= 1:
             raise ValueError("Filter critical frequency is too high.")
-        b, a = signal.butter(order, normal_cutoff, btype='low', analog=False)
-        return signal.filtfilt(b, a, data)
+        # SOS cascade stays stable at low cutoffs where the (b, a) form is ill-conditioned;
+        # the cutoff is rounded to 4 significant figures so files with near-identical rates
+        # share one design (decimal places would zero or shift small cutoffs)
+        sos = _butter_lowpass_sos(float(f"{normal_cutoff:.4g}"), order)
+        return signal.sosfiltfilt(sos, data)
 
     def process_file(self, filepath):
-        """Process a single Photon Timer binary file"""
+        """
+        Process a single Photon Timer binary file.
+        Returns (output_filename, arrays) where arrays holds the saved arrays still in
+        memory, so downstream steps don't have to reopen the .npz; None on failure.
+        """
         try:
             # Read the binary data
             data = self.read_binary_file(filepath)
@@ -31,19 +79,22 @@ class PicologPreprocessor:
             # Assuming the data contains timestamps in picoseconds
             timestamps_ps = data
 
-            # Convert timestamps to seconds
-            timestamps_s = timestamps_ps * 1e-12  # Convert to seconds
-
-            # Save original timestamps
-            original_timestamps = timestamps_s.copy()
+            if HAVE_NUMBA:
+                # seconds, positive differences and their timestamps in one fused pass
+                original_timestamps, time_diffs, timestamps_filtered = _scale_diff_positive(timestamps_ps)
+            else:
+                # Convert timestamps to seconds; the ufunc result is already a fresh
+                # array, so it is saved as the original timestamps without a copy
+                timestamps_s = timestamps_ps * 1e-12  # Convert to seconds
+                original_timestamps = timestamps_s
 
-            # Compute time differences (assuming timestamps are sorted)
-            time_diffs = np.diff(timestamps_s)
+                # Compute time differences (assuming timestamps are sorted)
+                time_diffs = np.diff(timestamps_s)
 
-            # Remove zero or negative time differences
-            valid_indices = time_diffs > 0
-            time_diffs = time_diffs[valid_indices]
-            timestamps_filtered = timestamps_s[1:][valid_indices]
+                # Remove zero or negative time differences
+                valid_indices = time_diffs > 0
+                time_diffs = time_diffs[valid_indices]
+                timestamps_filtered = timestamps_s[1:][valid_indices]
 
             if len(time_diffs) == 0:
                 logging.warning(f"No valid time differences found in {filepath.name}")
@@ -53,15 +104,16 @@ class PicologPreprocessor:
             # Generate a unique filename to prevent overwriting
             unique_id = uuid.uuid4().hex[:8]
             output_filename = self.processed_directory / f"processed_{filepath.stem}_{unique_id}.npz"
-            np.savez(output_filename,
-                     timestamps=original_timestamps,
-                     timestamps_filtered=timestamps_filtered,
-                     time_diffs=time_diffs)
+            arrays = {'timestamps': original_timestamps,
+                      'timestamps_filtered': timestamps_filtered,
+                      'time_diffs': time_diffs}
+            np.savez(output_filename, **arrays)
 
             logging.info(f"Processed {filepath.name}")
-            logging.info(f"Saved variables in {output_filename.name}: {list(np.load(output_filename).keys())}")
+            # names come from what was written, not from reopening the archive
+            logging.info(f"Saved variables in {output_filename.name}: {list(arrays)}")
 
-            return output_filename  # Return the path to the processed file
+            return output_filename, arrays
 
         except Exception as e:
             logging.error(f"Error processing {filepath.name}: {str(e)}")
@@ -72,7 +124,14 @@ class PicologPreprocessor:
         try:
             # Adjust the dtype and byte order according to your .bin file format
             # Here, we assume 64-bit unsigned integers in little-endian format
-            data = np.fromfile(filepath, dtype='<u8')
+            try:
+                # Memory-map so pages are read as the processing walks the file
+                data = np.memmap(filepath, dtype='<u8', mode='r')
+            except (ValueError, OSError):
+                # empty, truncated or unmappable (pipe/stream) files: plain read
+                with open(filepath, 'rb') as f:
+                    raw = f.read()
+                data = np.frombuffer(raw, dtype='<u8', count=len(raw) // 8)
             return data
         except Exception as e:
             logging.error(f"Error reading binary file {filepath.name}: {str(e)}")
@@ -1,9 +1,11 @@
 import os
+import sys
 import threading
+import time
 import pickle 
 from pathlib import Path
 from queue import Queue, Empty
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 import logging
 import numpy as np
 from watchdog.observers import Observer
@@ -13,9 +15,16 @@ from fpga_processor import process_fpga_file
 from gagescope_processor import process_gagescope_file
 import datetime
 import re
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
+# %-style arguments: messages on the per-file path are only formatted if a handler wants them
+logger = logging.getLogger(__name__)
 
 DATA_DIR = Path("C:\\Users\\jayom\\Downloads\\run_analyses_files")
 JKAM_COUNTS_FILE = DATA_DIR / "run4_jkam_counts_array(3).pkl"
@@ -24,26 +33,114 @@ PT_TIMESTAMP_FILE = DATA_DIR / "run4_FPGA_timestamp_array_raw.pkl"
 GAGE_CMPLEX_FILE = DATA_DIR / "run4_hann_gage_cmplx_amp_5_1.pkl"
 GAGE_TIMEBIN_FILE = DATA_DIR / "run4_hann_gage_timebin_5_1.pkl"  # Needed?
 
+# results waiting for the GUI; when full, processing blocks until the display catches up
+DISPLAY_QUEUE_SIZE = 1024
+# a new file is queued as soon as its writer closes it, or once it has gone this long
+# (seconds) without being modified where close events aren't reported
+FILE_SETTLE_TIME = 0.5
+
+if HAVE_NUMBA:
+    # eager signatures: the first gagescope FFT isn't a JIT compile
+    @njit('f4[::1](f8[::1], f8, f8, i8)', cache=True, nogil=True)
+    def _event_density(timestamps, t0, dt, n):
+        """Count timestamps per grid point t0 + k*dt in one pass, straight into the float32 FFT input"""
+        out = np.zeros(n, dtype=np.float32)
+        for t in timestamps:
+            out[int((t - t0) / dt + 0.5)] += 1
+        return out
+
+    @njit('b1(f8[::1])', cache=True, nogil=True)
+    def _is_strictly_increasing(x):
+        """Stops at the first out-of-order pair; no temporaries"""
+        for i in range(1, x.shape[0]):
+            if not x[i] > x[i - 1]:
+                return False
+        return True
+
+class RaggedArray:
+    """
+    Variable-length rows stored flat: row i is values[offsets[i]:offsets[i + 1]].
+    Both arrays can be memory-mapped, so indexing a row only touches its own pages.
+    """
+    def __init__(self, values: np.ndarray, offsets: np.ndarray):
+        self.values = values
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+def _copy_is_current(copy_path: Path, *sources: Path) -> bool:
+    """A derived .npy is only used if it's at least as new as every source that still exists"""
+    if not copy_path.exists():
+        return False
+    copy_mtime = copy_path.stat().st_mtime
+    return all(not src.exists() or src.stat().st_mtime <= copy_mtime for src in sources)
+
+def _ragged_paths(pkl_path: Path) -> Tuple[Path, Path]:
+    return (pkl_path.with_name(f"{pkl_path.stem}_values.npy"),
+            pkl_path.with_name(f"{pkl_path.stem}_offsets.npy"))
+
+def _save_npy_copy(npy_path: Path, arr: np.ndarray):
+    """One-time migration of a pickled array to .npy; object arrays can't be mapped and are skipped"""
+    if arr.dtype.hasobject:
+        return
+    tmp_path = npy_path.with_name(npy_path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.save(f, arr, allow_pickle=False)
+        os.replace(tmp_path, npy_path)
+        logger.info("Wrote %s; it will be memory-mapped on later starts", npy_path.name)
+    except OSError as e:
+        logger.warning("Could not write %s: %s", npy_path.name, e)
+
+def _save_ragged_copy(pkl_path: Path, rows):
+    """One-time migration of pickled per-shot rows (arrays or None) to flat values + offsets .npy files"""
+    try:
+        parts = [np.ravel(row) for row in rows if row is not None]
+        lengths = [0 if row is None else np.size(row) for row in rows]
+        values = np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+        offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+    except (TypeError, ValueError) as e:
+        logger.warning("PT timestamps can't be flattened for memory-mapping: %s", e)
+        return
+    values_path, offsets_path = _ragged_paths(pkl_path)
+    # offsets last: the pair is only used once both exist
+    _save_npy_copy(values_path, values)
+    _save_npy_copy(offsets_path, offsets)
+
+def _suffix_key(path: str) -> str:
+    """Lower-cased, interned extension: '.H5' finds the '.h5' processor, and lookups hit by identity"""
+    return sys.intern(os.path.splitext(path)[1].lower())
+
+_SHOT_RE = re.compile(r'_(\d{5})')
+
 def extract_shot_num_from_filename(filename: str) -> int:
-    match = re.search(r'_(\d{5})', filename)
+    match = _SHOT_RE.search(filename)
     if match:
         return int(match.group(1))
     else:
-        logging.warning(f"Could not extract shot number from filename: {filename}")
+        logger.warning("Could not extract shot number from filename: %s", filename)
         return -1
 
 class FileProcessor:
     def __init__(self):
         self.processors: Dict[str, str] = {}
         self.processing_queue = Queue()
-        self.display_queue = Queue()
+        self.display_queue = Queue(maxsize=DISPLAY_QUEUE_SIZE)
         self.observer = Observer()
         self.should_continue = True
+        # several process_queue workers share the counters below
+        self._results_lock = threading.Lock()
 
         self.jkam_data_loaded = False
         self.jkam_counts_array = None
         self.jkam_frames_array = None
         self.pt_timestamp_array = None
+        # median PT timestamp per shot, NaN where a shot has none
+        self._pt_median = None
         self.load_all_data()
 
         self.total_accepted_files = 0
@@ -51,96 +148,150 @@ class FileProcessor:
         self.cumulative_value = 0
 
     def load_all_data(self):
-        if not JKAM_COUNTS_FILE.exists():
-            logging.error(f"JKAM counts file not found: {JKAM_COUNTS_FILE}")
+        if not (JKAM_COUNTS_FILE.exists() or JKAM_COUNTS_FILE.with_suffix('.npy').exists()):
+            logger.error("JKAM counts file not found: %s", JKAM_COUNTS_FILE)
             return
-        if not JKAM_FRAMES_FILE.exists():
-            logging.error(f"JKAM frames file not found: {JKAM_FRAMES_FILE}")
+        if not (JKAM_FRAMES_FILE.exists() or JKAM_FRAMES_FILE.with_suffix('.npy').exists()):
+            logger.error("JKAM frames file not found: %s", JKAM_FRAMES_FILE)
             return
         try:
-            with open(JKAM_COUNTS_FILE, 'rb') as f:
-                self.jkam_counts_array = np.load(f, allow_pickle=True)
-        except:
-            with open(JKAM_COUNTS_FILE, 'rb') as f:
-                self.jkam_counts_array = pickle.load(f)
-
-        try:
-            with open(JKAM_FRAMES_FILE, 'rb') as f:
-                self.jkam_frames_array = np.load(f, allow_pickle=True)
-        except:
-            with open(JKAM_FRAMES_FILE, 'rb') as f:
-                self.jkam_frames_array = pickle.load(f)
-
-        if not isinstance(self.jkam_counts_array, np.ndarray):
-            self.jkam_counts_array = np.array(self.jkam_counts_array)
-        if not isinstance(self.jkam_frames_array, np.ndarray):
-            self.jkam_frames_array = np.array(self.jkam_frames_array)
+            self.jkam_counts_array = self._load_jkam_array(JKAM_COUNTS_FILE)
+            self.jkam_frames_array = self._load_jkam_array(JKAM_FRAMES_FILE)
+        except (pickle.UnpicklingError, ValueError, EOFError, OSError) as e:
+            logger.warning("Could not load JKAM data, shots won't be checked: %s", e)
+            self.jkam_counts_array = None
+            self.jkam_frames_array = None
+            return
 
         self.jkam_data_loaded = True
-        logging.info(f"Loaded JKAM data: counts shape={self.jkam_counts_array.shape}, frames shape={self.jkam_frames_array.shape}")
-
-        if PT_TIMESTAMP_FILE.exists():
+        logger.info("Loaded JKAM data: counts shape=%s, frames shape=%s", self.jkam_counts_array.shape, self.jkam_frames_array.shape)
+
+        values_path, offsets_path = _ragged_paths(PT_TIMESTAMP_FILE)
+        if (_copy_is_current(values_path, PT_TIMESTAMP_FILE)
+                and _copy_is_current(offsets_path, PT_TIMESTAMP_FILE)):
+            self.pt_timestamp_array = RaggedArray(np.load(values_path, mmap_mode='r'),
+                                                  np.load(offsets_path, mmap_mode='r'))
+            logger.info("PT timestamp data loaded for JKAM timing reference.")
+        elif PT_TIMESTAMP_FILE.exists():
             try:
                 with open(PT_TIMESTAMP_FILE, 'rb') as f:
                     self.pt_timestamp_array = pickle.load(f)
-                logging.info("PT timestamp data loaded for JKAM timing reference.")
+                logger.info("PT timestamp data loaded for JKAM timing reference.")
+                _save_ragged_copy(PT_TIMESTAMP_FILE, self.pt_timestamp_array)
             except Exception as e:
-                logging.warning(f"Error loading PT timestamps: {e}")
+                logger.warning("Error loading PT timestamps: %s", e)
                 self.pt_timestamp_array = None
         else:
-            logging.warning("PT timestamp file not found, JKAM time will be N/A")
+            logger.warning("PT timestamp file not found, JKAM time will be N/A")
             self.pt_timestamp_array = None
 
+        if self.pt_timestamp_array is not None:
+            self._pt_median = self._load_pt_medians()
+
+    def _load_pt_medians(self) -> np.ndarray:
+        """Per-shot medians, computed once and kept as .npy so later starts just map them"""
+        medians_path = PT_TIMESTAMP_FILE.with_name(f"{PT_TIMESTAMP_FILE.stem}_medians.npy")
+        # rebuilt along with the values/offsets pair it was computed from
+        values_path, offsets_path = _ragged_paths(PT_TIMESTAMP_FILE)
+        if _copy_is_current(medians_path, PT_TIMESTAMP_FILE, values_path, offsets_path):
+            return np.load(medians_path, mmap_mode='r')
+        rows = self.pt_timestamp_array
+        medians = np.fromiter((np.median(row) if row is not None and len(row) > 0 else np.nan
+                               for row in rows), dtype=np.float64, count=len(rows))
+        _save_npy_copy(medians_path, medians)
+        return medians
+
+    def _load_jkam_array(self, pkl_path: Path) -> np.ndarray:
+        """
+        Memory-map the .npy copy of a JKAM array if there is one no older than the pickle;
+        otherwise load the pickle and (re)write that copy so the next start can map it.
+        """
+        npy_path = pkl_path.with_suffix('.npy')
+        if _copy_is_current(npy_path, pkl_path):
+            return np.load(npy_path, mmap_mode='r')
+        # one open, format decided by the magic bytes rather than by a failed parse
+        with open(pkl_path, 'rb') as f:
+            is_npy = f.read(6) == b'\x93NUMPY'
+            f.seek(0)
+            arr = np.load(f, allow_pickle=True) if is_npy else pickle.load(f)
+        if isinstance(arr, list) and arr and isinstance(arr[0], np.ndarray):
+            # one copy into a known C-contiguous layout
+            arr = np.stack(arr)
+        else:
+            # no copy when it's already an ndarray
+            arr = np.asarray(arr)
+        _save_npy_copy(npy_path, arr)
+        return arr
+
     def register_processor(self, extension: str, processor_type: str):
-        self.processors[extension] = processor_type
+        self.processors[sys.intern(extension.lower())] = processor_type
 
-    def process_file(self, filepath: Path):
-        logging.info(f"Processing file: {filepath}")
-        processor_type = self.processors.get(filepath.suffix)
+    def process_file(self, path_str: str, suffix: str):
+        """Process one queued file; the watcher passes the path as a str with its suffix already split off"""
+        logger.info("Processing file: %s", path_str)
+        processor_type = self.processors.get(suffix)
         if not processor_type:
-            logging.warning(f"No processor registered for {filepath.suffix}")
+            logger.warning("No processor registered for %s", suffix)
             return
 
+        # one stat per file: its mtime is the file time reported by evaluate_file
+        try:
+            st = os.stat(path_str)
+        except OSError as e:
+            logger.error("Cannot stat %s: %s", path_str, e)
+            return
+        if st.st_size == 0:
+            logger.warning("Skipping empty file %s", path_str)
+            return
+
+        filepath = Path(path_str)
+
         if processor_type == "photon":
-            output_file = process_photon_file(filepath)
+            result = process_photon_file(filepath)
         elif processor_type == "fpga":
-            output_file = process_fpga_file(filepath)
+            result = process_fpga_file(filepath)
         elif processor_type == "gagescope":
-            output_file = process_gagescope_file(filepath)
+            result = process_gagescope_file(filepath)
         else:
-            output_file = None
+            result = None
 
-        if output_file is None:
-            logging.error(f"Failed to process file {filepath}")
+        if result is None:
+            logger.error("Failed to process file %s", filepath)
             return
+        # processors hand back the arrays they saved, so nothing below reopens the output file
+        output_file, arrays = result
 
-        accepted, stats = self.evaluate_file(output_file, processor_type)
+        accepted, stats = self.evaluate_file(output_file, processor_type, mtime=st.st_mtime)
 
         if processor_type == "gagescope":
-            fft_data = self.perform_fft(output_file)
+            fft_data = self.perform_fft(output_file, arrays)
             stats['fft_data'] = fft_data
         else:
             stats['fft_data'] = None
 
-        self.total_files_processed += 1
-        if accepted:
-            self.total_accepted_files += 1
-            self.cumulative_value += 1
-        else:
-            self.cumulative_value = 0
-
-        stats['cumulative_value'] = self.cumulative_value
-        stats['experiment_number'] = self.total_files_processed
         stats['file_name'] = output_file.name
         stats['accepted'] = accepted
         stats['processor_type'] = processor_type
 
-        self.display_queue.put((processor_type, output_file, accepted, stats))
-        logging.info(f"Finished processing: {filepath}, accepted={accepted}")
+        # numbering and queueing together, so experiment numbers reach the display in order
+        with self._results_lock:
+            self.total_files_processed += 1
+            if accepted:
+                self.total_accepted_files += 1
+                self.cumulative_value += 1
+            else:
+                self.cumulative_value = 0
+
+            stats['cumulative_value'] = self.cumulative_value
+            stats['experiment_number'] = self.total_files_processed
+
+            self.display_queue.put((processor_type, output_file, accepted, stats))
+        logger.info("Finished processing: %s, accepted=%s", filepath, accepted)
 
-    def evaluate_file(self, output_file: Path, processor_type: str) -> Tuple[bool, Dict[str, float]]:
+    def evaluate_file(self, output_file: Path, processor_type: str,
+                      mtime: Optional[float] = None) -> Tuple[bool, Dict[str, float]]:
         try:
-            file_creation_time = os.path.getmtime(output_file)
+            file_creation_time = os.path.getmtime(output_file) if mtime is None else mtime
             shot_num = extract_shot_num_from_filename(output_file.name)
 
             if not self.jkam_data_loaded:
@@ -160,14 +311,10 @@ class FileProcessor:
                         accepted = True
                         space_correct = True
                         jk_shot = str(shot_num)
-                        if (self.pt_timestamp_array is not None 
-                            and shot_num < len(self.pt_timestamp_array) 
-                            and self.pt_timestamp_array[shot_num] is not None 
-                            and len(self.pt_timestamp_array[shot_num]) > 0):
-                            jk_time_val = np.median(self.pt_timestamp_array[shot_num])
-                            jk_time = f"{jk_time_val:.2f}"
-                        else:
-                            jk_time = "N/A"
+                        jk_time_val = np.nan
+                        if self._pt_median is not None and shot_num < len(self._pt_median):
+                            jk_time_val = self._pt_median[shot_num]
+                        jk_time = "N/A" if np.isnan(jk_time_val) else f"{jk_time_val:.2f}"
                     else:
                         accepted = False
                         space_correct = False
@@ -184,58 +331,67 @@ class FileProcessor:
             }
 
             if accepted:
-                logging.info(f"File {output_file.name} accepted (JKAM Shot: {jk_shot}, JKAM Time: {jk_time}).")
+                logger.info("File %s accepted (JKAM Shot: %s, JKAM Time: %s).", output_file.name, jk_shot, jk_time)
             else:
-                logging.info(f"File {output_file.name} rejected (JKAM Shot: {jk_shot}).")
+                logger.info("File %s rejected (JKAM Shot: %s).", output_file.name, jk_shot)
 
             return accepted, stats
 
         except Exception as e:
-            logging.error(f"Error evaluating file {output_file.name}: {str(e)}")
+            logger.error("Error evaluating file %s: %s", output_file.name, e)
             return False, {}
 
-    def perform_fft(self, output_file: Path):
+    def perform_fft(self, output_file: Path, arrays: Dict[str, np.ndarray]):
         try:
-            data = np.load(output_file)
-            if 'timestamps' not in data.files:
-                logging.warning(f"No 'timestamps' in {output_file.name} for FFT.")
+            if 'timestamps' not in arrays:
+                logger.warning("No 'timestamps' in %s for FFT.", output_file.name)
                 return None
 
-            timestamps = data['timestamps']
+            # the kernels below are compiled for contiguous float64 only
+            timestamps = np.ascontiguousarray(arrays['timestamps'], dtype=np.float64)
             if len(timestamps) < 2:
-                logging.warning("Not enough data for FFT.")
+                logger.warning("Not enough data for FFT.")
                 return None
 
-            if not np.all(np.diff(timestamps) > 0):
-                logging.warning("Timestamps not strictly increasing, sorting.")
+            if HAVE_NUMBA:
+                increasing = _is_strictly_increasing(timestamps)
+            else:
+                # compares neighbours directly: a bool temporary instead of a float64 diff array
+                increasing = (timestamps[1:] > timestamps[:-1]).all()
+            if not increasing:
+                logger.warning("Timestamps not strictly increasing, sorting.")
                 timestamps = np.sort(timestamps)
 
-            time_intervals = np.diff(timestamps)
-            dt = np.mean(time_intervals)
+            # mean of the consecutive differences telescopes to (last - first) / (n - 1)
+            dt = (timestamps[-1] - timestamps[0]) / (len(timestamps) - 1)
             if dt <= 0:
-                logging.error(f"Invalid dt={dt}")
+                logger.error("Invalid dt=%s", dt)
                 return None
 
             min_time = timestamps[0]
             max_time = timestamps[-1]
-            num_samples = int((max_time - min_time) / dt)
+            num_samples = int((max_time - min_time) / dt + 0.5)
             if num_samples <= 0:
-                logging.error("No valid samples for FFT.")
+                logger.error("No valid samples for FFT.")
                 return None
 
-            uniform_times = np.linspace(min_time, max_time, num_samples)
-            signal = np.interp(uniform_times, timestamps, np.ones_like(timestamps))
+            # event density on the uniform grid min_time + k*dt, k = 0..num_samples: each
+            # timestamp counts toward its nearest grid point, so rounding in t/dt can't merge two
+            num_bins = num_samples + 1
+            if HAVE_NUMBA:
+                signal = _event_density(timestamps, min_time, dt, num_bins)
+            else:
+                idx = ((timestamps - min_time) / dt + 0.5).astype(np.int64)
+                signal = np.bincount(idx, minlength=num_bins).astype(np.float32)
 
-            fft_values = np.fft.fft(signal)
-            fft_freq = np.fft.fftfreq(len(signal), d=dt)
-            positive_freqs = fft_freq > 0
-            fft_freq = fft_freq[positive_freqs]
-            fft_values = np.abs(fft_values[positive_freqs])
+            # real input: rfft computes only the non-negative half, drop DC as before
+            fft_values = np.abs(np.fft.rfft(signal))[1:]
+            fft_freq = np.fft.rfftfreq(num_bins, d=dt)[1:]
 
             fft_data = {'freq': fft_freq, 'amplitude': fft_values}
             return fft_data
         except Exception as e:
-            logging.error(f"Error performing FFT on {output_file.name}: {str(e)}")
+            logger.error("Error performing FFT on %s: %s", output_file.name, e)
             return None
 
 
@@ -243,20 +399,54 @@ class FileWatcher(FileSystemEventHandler):
     def __init__(self, processor: FileProcessor):
         super().__init__()
         self.processor = processor
+        # created files still being written: path -> monotonic time it may be queued at
+        self._pending: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._release_thread = threading.Thread(target=self._release_settled, daemon=True)
+        self._release_thread.start()
 
     def on_created(self, event):
         if not event.is_directory:
-            filepath = Path(event.src_path)
-            if filepath.suffix in self.processor.processors:
-                logging.info(f"File {filepath} created, adding to queue.")
-                threading.Timer(0.5, self.processor.processing_queue.put, args=[filepath]).start()
+            if _suffix_key(event.src_path) in self.processor.processors:
+                logger.info("File %s created, adding to queue.", event.src_path)
+                with self._cond:
+                    self._pending[event.src_path] = time.monotonic() + FILE_SETTLE_TIME
+                    self._cond.notify()
+
+    def on_modified(self, event):
+        # still being written: push its release back
+        with self._cond:
+            if event.src_path in self._pending:
+                self._pending[event.src_path] = time.monotonic() + FILE_SETTLE_TIME
+
+    def on_closed(self, event):
+        # the writer closed it (reported by inotify), so it's complete: queue it right away
+        with self._cond:
+            if self._pending.pop(event.src_path, None) is not None:
+                self._enqueue(event.src_path)
+
+    def _enqueue(self, path: str):
+        # queue items are (path, suffix) strings; workers only build a Path for the processors
+        self.processor.processing_queue.put((path, _suffix_key(path)))
+
+    def _release_settled(self):
+        """Single thread that queues pending files once they've settled"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for path, due in list(self._pending.items()):
+                    if due <= now:
+                        del self._pending[path]
+                        self._enqueue(path)
+                timeout = min(self._pending.values()) - now if self._pending else None
+                self._cond.wait(timeout)
 
 def process_queue(processor: FileProcessor):
     while processor.should_continue:
         try:
-            filepath = processor.processing_queue.get(timeout=1)
-            processor.process_file(filepath)
+            path_str, suffix = processor.processing_queue.get(timeout=1)
+            processor.process_file(path_str, suffix)
         except Empty:
             continue
         except Exception as e:
-            logging.error(f"Error in process_queue: {str(e)}")
+            logger.error("Error in process_queue: %s", e)